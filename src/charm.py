@@ -5,13 +5,11 @@
 """Charmed Operator for Ubuntu langpacks."""
 
 import logging
+from functools import cached_property
 from subprocess import CalledProcessError
 
 import ops
-from charms.operator_libs_linux.v0.apt import PackageError, PackageNotFoundError
-from git import GitCommandError
 from ops.model import Secret
-from requests.exceptions import RequestException
 
 from langpacks import Langpacks
 from launchpad import LaunchpadClient
@@ -32,10 +30,15 @@ class UbuntuLangpacksCharm(ops.CharmBase):
         self.framework.observe(self.on.upload_langpacks_action, self._on_upload_langpacks)
         self.framework.observe(self.on.stop, self._on_stop)
 
-        self._langpacks = Langpacks(LaunchpadClient())
+    @cached_property
+    def _langpacks(self) -> Langpacks:
+        """Langpacks workload, only set up for the hooks that use it."""
+        return Langpacks(LaunchpadClient)
 
     def _on_start(self, event: ops.StartEvent):
         """Handle start event."""
+        from git import GitCommandError
+
         self.unit.status = ops.MaintenanceStatus("Updating langpack-o-matic checkout")
 
         try:
@@ -50,6 +53,9 @@ class UbuntuLangpacksCharm(ops.CharmBase):
 
     def _on_install(self, event: ops.InstallEvent):
         """Handle install event."""
+        from charms.operator_libs_linux.v0.apt import PackageError, PackageNotFoundError
+        from git import GitCommandError
+
         self.unit.status = ops.MaintenanceStatus("Setting up environment")
         try:
             self._langpacks.install()
@@ -89,7 +95,7 @@ class UbuntuLangpacksCharm(ops.CharmBase):
 
         try:
             self._langpacks.import_gpg_key(keycontent)
-        except CalledProcessError:
+        except (CalledProcessError, ValueError):
             self.unit.status = ops.ActiveStatus(
                 "Failed to import the signing key. Check `juju debug-log` for details."
             )
@@ -100,15 +106,20 @@ class UbuntuLangpacksCharm(ops.CharmBase):
 
     def _on_build_langpacks(self, event: ops.ActionEvent):
         """Build new langpacks."""
-        release = event.params["release"]
+        from git import GitCommandError
+        from requests.exceptions import RequestException
+
+        # Several releases can be given, separated by commas or spaces
+        releases = event.params["release"].replace(",", " ").split()
         base = event.params["base"]
+        both = event.params["both"]
 
         self.unit.status = ops.MaintenanceStatus("Building langpacks")
 
         try:
             event.log("Building langpacks, it may take a while")
-            self._langpacks.build_langpacks(base, release)
-        except (CalledProcessError, IOError, RequestException):
+            self._langpacks.build_langpacks_many(base, releases, both)
+        except (CalledProcessError, GitCommandError, IOError, RequestException):
             event.log("Langpacks build failed")
             self.unit.status = ops.ActiveStatus(
                 "Failed to build langpacks. Check `juju debug-log` for details."
@@ -3,16 +3,16 @@
 
 """Representation of the langpacks service."""
 
+import hashlib
 import logging
 import os
 import shutil
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
-from subprocess import PIPE, STDOUT, CalledProcessError, run
-
-import charms.operator_libs_linux.v0.apt as apt
-import requests
-from charms.operator_libs_linux.v0.apt import PackageError, PackageNotFoundError
-from git import GitCommandError, Repo
+from subprocess import DEVNULL, PIPE, STDOUT, CalledProcessError, Popen, run
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -28,198 +28,371 @@ PACKAGES = [
     "git",
     "devscripts",
     "lintian",
+    # Recommended by devscripts, the packages are installed without the
+    # recommends and gpg is needed to import the key and by debsign
+    "gnupg",
 ]
 
 BUILDDIR = Path("/app/build")
 LOGDIR = Path("/app/log")
 REPO_LOCATION = Path("/app/langpack-o-matic")
 REPO_URL = "https://git.launchpad.net/langpack-o-matic"
+BIN_DIR = str(REPO_LOCATION / "bin")
+IMPORT_SCRIPT = str(REPO_LOCATION / "import")
+PACKAGES_SCRIPT = str(REPO_LOCATION / "packages")
+TRANSLATIONS_URL = "https://translations.launchpad.net/"
+
+# Skip refreshing the apt index if it was updated less than an hour ago.
+APT_UPDATE_STAMP = Path("/var/lib/apt/periodic/update-success-stamp")
+APT_UPDATE_MAX_AGE = 3600
+
+# Response headers kept next to a downloaded tarball, and the conditional
+# request headers they are sent back as.
+CACHE_VALIDATORS = {"ETag": "If-None-Match", "Last-Modified": "If-Modified-Since"}
+
+
+def _run_logged(argv: list, **kwargs):
+    """Run a command whose output is only needed when it fails.
+
+    stdout is discarded and stderr is kept as bytes on the CalledProcessError
+    raised on failure, so successful runs don't buffer nor decode the command
+    output.
+    """
+    return run(argv, check=True, stdout=DEVNULL, stderr=PIPE, **kwargs)
+
+
+def _gpg_key_stamp() -> Path:
+    """Path of the sha256 of the last imported signing key.
+
+    It lives in the gpg home so it goes away together with the keyring.
+    """
+    gnupghome = os.environ.get("GNUPGHOME") or Path.home() / ".gnupg"
+    return Path(gnupghome) / "langpacks-key.sha256"
+
+
+def _apt_install(packages: list, **kwargs):
+    """Install deb packages without their recommends, keeping modified conffiles."""
+    return run(
+        [
+            "apt-get",
+            "install",
+            "-y",
+            "--option=Dpkg::Options::=--force-confold",
+            "--no-install-recommends",
+            *packages,
+        ],
+        check=True,
+        # Untranslated messages, _add_packages looks for the not found error
+        env={**os.environ, "DEBIAN_FRONTEND": "noninteractive", "LC_ALL": "C"},
+        **kwargs,
+    )
+
+
+def _sha256sum(path: Path) -> str:
+    """Return the sha256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _log_tail(path: Path, size: int = 8192) -> str:
+    """Return the end of a log file, for the failure messages."""
+    with open(path, "rb") as f:
+        f.seek(max(f.seek(0, os.SEEK_END) - size, 0))
+        return f.read().decode(errors="replace")
 
 
 class Langpacks:
     """Represent a langpacks instance in the workload."""
 
-    def __init__(self, launchpad_client):
+    def __init__(self, launchpad_client_factory):
         logger.debug("Langpacks class init")
-        self.launchpad_client = launchpad_client
+        self._launchpad_client_factory = launchpad_client_factory
+
+    @cached_property
+    def launchpad_client(self):
+        """Launchpad client, only created once a build needs it."""
+        return self._launchpad_client_factory()
+
+    @cached_property
+    def _http(self):
+        """HTTP session shared by the tarball downloads."""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        # Keep the connections alive between the downloads, which can run
+        # concurrently for several releases. The translations pages redirect
+        # to the librarian host serving the tarballs, so mount the adapter
+        # for any host rather than only the translations one
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.5),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
 
     def setup_crontab(self):
         """Configure the crontab for the service."""
         try:
-            run(
+            _run_logged(
                 [
                     "crontab",
                     "src/crontab",
                 ],
-                check=True,
-                stdout=PIPE,
-                stderr=STDOUT,
-                text=True,
             )
             logger.debug("Crontab configured.")
             return
         except CalledProcessError as e:
-            logger.debug("Installation of the crontab failed: '%s'", e.stdout)
+            logger.debug(
+                "Installation of the crontab failed: '%s'", e.stderr.decode(errors="replace")
+            )
             raise
 
     def _checkout_git(self, repo_url: str, clone_path: str):
         """Check out a Git repository."""
+        from git import GitCommandError, Repo
+
         logger.debug("Cloning repository from %s to %s", repo_url, clone_path)
         try:
-            Repo.clone_from(repo_url, clone_path)
+            # Only the current tree is needed to build and run the scripts
+            Repo.clone_from(repo_url, clone_path, depth=1, single_branch=True, no_tags=True)
         except GitCommandError as e:
             logger.error("Error cloning repository: %s", e)
             raise
 
     def _update_git(self, repo_url: str, clone_path: str):
         """Update a Git repository checkout."""
+        from git import GitCommandError, Repo
+
         try:
             repo = Repo(clone_path)
-            origin = repo.remotes.origin
-            origin.pull()
+            # Check the remote head first, a pull would refetch objects the
+            # shallow clone already has and deepen it over time
+            remote_head = repo.git.ls_remote("origin", "HEAD").split()
+            if not remote_head:
+                logger.debug("Remote HEAD not advertised, fetching it anyway.")
+            # Resolve the local HEAD from the ref files, without a git call
+            elif repo.head.dereference_recursive(repo, "HEAD") == remote_head[0]:
+                logger.debug("Repository already up to date.")
+                return
+
+            repo.git.fetch("--depth=1", "origin", "HEAD")
+            repo.git.reset("--hard", "FETCH_HEAD")
             logger.debug("Repository updated.")
         except GitCommandError as e:
             logger.error("Error updating repository: %s", e)
             raise
 
-    def install(self):
-        """Install the langpack builder environment."""
-        # Install the deb packages needed for the service
+    def _checkout_head(self) -> str:
+        """Return the commit of the langpack-o-matic checkout."""
+        from git import Repo
+
+        repo = Repo(REPO_LOCATION)
+        return repo.head.dereference_recursive(repo, "HEAD")
+
+    def _apt_cache_fresh(self) -> bool:
+        """Check if the apt index was refreshed recently."""
         try:
-            apt.update()
-            logger.debug("Apt index refreshed.")
-        except CalledProcessError as e:
-            logger.error("Failed to update package cache: %s", e)
-            raise
+            mtime = os.stat(APT_UPDATE_STAMP).st_mtime
+        except FileNotFoundError:
+            return False
+        return time.time() - mtime < APT_UPDATE_MAX_AGE
+
+    def _add_packages(self):
+        """Install the packages one by one, to find out which one fails."""
+        from charms.operator_libs_linux.v0.apt import PackageError, PackageNotFoundError
 
         for p in PACKAGES:
             try:
-                apt.add_package(p)
+                _apt_install([p], stdout=DEVNULL, stderr=PIPE)
                 logger.debug("Package %s installed", p)
-            except PackageNotFoundError:
-                logger.error("Failed to find package %s in package cache", p)
-                raise
-            except PackageError as e:
-                logger.error("Failed to install %s: %s", p, e)
-                raise
-
-        # Clone the langpack-o-matic repo
-        try:
-            self._checkout_git(REPO_URL, REPO_LOCATION)
-            logger.debug("Langpack-o-matic vcs cloned.")
-        except GitCommandError:
-            raise
+            except CalledProcessError as e:
+                stderr = e.stderr.decode(errors="replace")
+                if "Unable to locate package" in stderr:
+                    logger.error("Failed to find package %s in package cache", p)
+                    raise PackageNotFoundError(f"Package {p} not found") from None
+                logger.error("Failed to install %s: %s", p, stderr)
+                raise PackageError(f"Could not install package {p}: {stderr}") from None
 
+    def install(self):
+        """Install the langpack builder environment."""
         # Create the build and log directories
         for dname in (BUILDDIR, LOGDIR):
             try:
-                os.mkdir(dname)
+                dname.mkdir(parents=True, exist_ok=True)
                 logger.debug("Directory %s created", dname)
             except OSError as e:
                 logger.warning("Creating directory %s failed: %s", dname, e)
                 raise
 
+        # Install the deb packages needed for the service
+        if self._apt_cache_fresh():
+            logger.debug("Apt cache fresh, skipping update.")
+        else:
+            # Only binary packages are needed, skip the Translation-* indexes
+            try:
+                _run_logged(
+                    [
+                        "apt-get",
+                        "update",
+                        "--error-on=any",
+                        "-o",
+                        "Acquire::Languages=none",
+                        "-o",
+                        "APT::Get::List-Cleanup=0",
+                    ],
+                )
+                logger.debug("Apt index refreshed.")
+            except CalledProcessError as e:
+                logger.error(
+                    "Failed to update package cache: %s", e.stderr.decode(errors="replace")
+                )
+                raise
+
+        # Install all the packages in a single apt transaction, the charm lib
+        # would otherwise call apt-get once per package
+        try:
+            logpath = LOGDIR / "install.log"
+            with open(logpath, "ab") as logfile:
+                _apt_install(PACKAGES, stdout=logfile, stderr=STDOUT)
+            logger.debug("Packages installed: %s", ", ".join(PACKAGES))
+        except CalledProcessError:
+            logger.error("Failed to install packages: %s", _log_tail(logpath))
+            # Retry one package at a time to find out which one is failing
+            self._add_packages()
+
+        # Clone the langpack-o-matic repo
+        self._checkout_git(REPO_URL, REPO_LOCATION)
+        logger.debug("Langpack-o-matic vcs cloned.")
+
     def update_checkout(self):
         """Update the langpack-o-matic checkout."""
-        try:
-            self._update_git(REPO_URL, REPO_LOCATION)
-            logger.debug("Langpack-o-matic checkout updated.")
-        except GitCommandError:
-            raise
+        self._update_git(REPO_URL, REPO_LOCATION)
+        logger.debug("Langpack-o-matic checkout updated.")
 
         # Call make target
         try:
-            run(
-                [
-                    "make",
-                    "-C",
-                    REPO_LOCATION / "bin",
-                ],
-                check=True,
-                stdout=PIPE,
-                stderr=STDOUT,
-                text=True,
-            )
+            logpath = LOGDIR / "make.log"
+            with open(logpath, "ab") as logfile:
+                run(
+                    [
+                        "make",
+                        "-C",
+                        BIN_DIR,
+                    ],
+                    check=True,
+                    stdout=logfile,
+                    stderr=STDOUT,
+                )
             logger.debug("Langpack-o-matic bin/msgequal build.")
-        except CalledProcessError as e:
-            logger.debug("Build of bin/msgequal failed %s", e.stdout)
+        except CalledProcessError:
+            logger.debug("Build of bin/msgequal failed %s", _log_tail(logpath))
             raise
 
     def _clean_builddir(self, releasedir: Path):
         """Clean build cache."""
-        if not os.path.exists(releasedir):
-            return
+        # rm copes with a missing directory and unlinks the large po files
+        # trees much faster than shutil.rmtree
+        try:
+            _run_logged(
+                [
+                    "rm",
+                    "-rf",
+                    releasedir,
+                ],
+            )
+            logger.debug("Removed the existing cache directory: %s", releasedir)
+        except CalledProcessError as e:
+            logger.error(
+                "Failed to remove cache directory %s: %s",
+                releasedir,
+                e.stderr.decode(errors="replace"),
+            )
 
-        if os.path.exists(releasedir):
-            try:
-                shutil.rmtree(releasedir)
-                logger.debug("Removed the existing cache directory: %s", releasedir)
-            except OSError as e:
-                logger.error("Failed to remove cache directory %s: %s", releasedir, e)
+    def _download_tarball(self, url: str, filename: Path) -> bool:
+        """Stream a tarball to disk, reusing the HTTP session between downloads.
+
+        The ETag and Last-Modified headers of the download are kept next to
+        the tarball and sent back on the next request, returns False if the
+        local tarball is still current.
+        """
+        validators = {
+            header: filename.with_name(f"{filename.name}.{header.lower()}")
+            for header in CACHE_VALIDATORS
+        }
+        # The tarballs are compressed already, don't ask for transfer encoding
+        headers = {"Accept-Encoding": "identity"}
+        if filename.exists():
+            for header, path in validators.items():
+                try:
+                    headers[CACHE_VALIDATORS[header]] = path.read_text()
+                except OSError:
+                    pass
 
-    def _download_tarball(self, url: str, filename: Path):
         try:
-            with requests.get(url, stream=True, timeout=10) as r:
+            with self._http.get(url, headers=headers, stream=True, timeout=(10, 300)) as r:
                 r.raise_for_status()
-
+                if r.status_code == 304:
+                    return False
+
+                # Don't trust the validators of a previous download if this
+                # one fails
+                for path in validators.values():
+                    path.unlink(missing_ok=True)
+                r.raw.decode_content = True
                 with open(filename, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        f.write(chunk)
+                    shutil.copyfileobj(r.raw, f, length=1024 * 1024)
+
+                for header, path in validators.items():
+                    value = r.headers.get(header)
+                    if value:
+                        path.write_text(value)
         except Exception:
             raise
 
-    def build_langpacks(self, base: bool, release: str):
-        """Build the langpacks."""
-        release = release.lower()
-        active_series = self.launchpad_client.active_series()
-
-        # check that the series used is valid
-        if release not in active_series:
-            logger.debug("Release %s isn't an active Ubuntu series", release)
-            return
-
-        releasedir = BUILDDIR / release
+        return True
 
+    def _build_options(self, base: bool, release: str):
+        """Return the download url, tarball path and import options of a build."""
         if base:
-            download_url = (
-                f"https://translations.launchpad.net/ubuntu/{release}/+latest-full-language-pack"
-            )
+            download_url = f"{TRANSLATIONS_URL}ubuntu/{release}/+latest-full-language-pack"
             tarball = REPO_LOCATION / f"ubuntu-{release}-translations.tar.gz"
             import_options = ["-v", "--treshold=10"]
-
-            # Clean existing cache directories before starting a base build
-            self._clean_builddir(releasedir)
-
         else:
-            download_url = (
-                f"https://translations.launchpad.net/ubuntu/{release}/+latest-delta-language-pack"
-            )
+            download_url = f"{TRANSLATIONS_URL}ubuntu/{release}/+latest-delta-language-pack"
             tarball = REPO_LOCATION / f"ubuntu-{release}-translations-update.tar.gz"
             import_options = ["-v", "--update", "--treshold=10"]
 
-        # Create the build target directory
-        try:
-            os.makedirs(releasedir, exist_ok=True)
-            logger.debug("Directory %s created", releasedir)
-        except OSError as e:
-            logger.warning("Creating directory %s failed: %s", releasedir, e)
-            raise
-
-        # Download the current translations tarball from launchpad
-        try:
-            self._download_tarball(download_url, tarball)
-            logger.debug("Translations tarball downloaded.")
-        except Exception as e:
-            logger.debug("Downloading %s failed: %s", download_url, e)
-            raise
+        return download_url, tarball, import_options
+
+    def _import_tarball(self, release: str, tarball: Path, import_options: list):
+        """Call the import script that prepares the packages."""
+        # A base import runs in a freshly cleaned build directory, only an
+        # update applied on top of it can repeat the previous import. The
+        # stamp records the scripts revision too, so a fix to them re-imports
+        update = "--update" in import_options
+        if update:
+            stamp = BUILDDIR / release / f".{tarball.name}.sha256"
+            digest = f"{self._checkout_head()} {_sha256sum(tarball)}"
+            try:
+                if stamp.read_text() == digest:
+                    logger.debug("Tarball %s already imported, skipping.", tarball)
+                    return
+            except OSError:
+                pass
 
-        # Call the import script that prepares the packages
         logger.debug("Creating the packages.")
         try:
             logpath = LOGDIR / release
-            with open(logpath, "a") as logfile:
+            with open(logpath, "ab") as logfile:
                 run(
-                    [REPO_LOCATION / "import"]
+                    [IMPORT_SCRIPT]
                     + import_options
                     + [
                         tarball,
@@ -230,53 +403,172 @@ class Langpacks:
                     cwd=BUILDDIR,
                     stdout=logfile,
                     stderr=STDOUT,
-                    text=True,
                 )
             logger.debug("Translations packages prepared.")
-        except Exception as e:
-            logger.debug("Building the langpacks source failed: %s", e.stdout)
+        except CalledProcessError:
+            logger.debug("Building the langpacks source failed: %s", _log_tail(logpath))
             raise
 
+        if update:
+            try:
+                stamp.write_text(digest)
+            except OSError as e:
+                logger.warning("Recording the imported tarball hash failed: %s", e)
+
+    def build_langpacks(
+        self, base: bool, release: str, both: bool = False, checkout: Optional[Future] = None
+    ):
+        """Build the langpacks.
+
+        If both is set, the base and the update packages are built in one go,
+        regardless of base. The langpack-o-matic checkout isn't updated here,
+        if checkout is set the imports wait for that pending update.
+        """
+        release = release.lower()
+        if release == "devel":
+            release = self.launchpad_client.devel_series()
+
+        # check that the series used is valid before downloading anything, the
+        # client caches the list for the concurrent builds
+        if release not in self.launchpad_client.active_series():
+            logger.debug("Release %s isn't an active Ubuntu series", release)
+            return
+
+        releasedir = BUILDDIR / release
+        builds = [self._build_options(b, release) for b in ((True, False) if both else (base,))]
+
+        # The tarball downloads are independent network requests, run them
+        # concurrently and prepare the build directory while they are in flight
+        with ThreadPoolExecutor(max_workers=len(builds)) as executor:
+            download_futures = [
+                executor.submit(self._download_tarball, download_url, tarball)
+                for download_url, tarball, _ in builds
+            ]
+
+            # Clean existing cache directories before starting a base build
+            if base or both:
+                self._clean_builddir(releasedir)
+
+            # Create the build target directory
+            try:
+                releasedir.mkdir(parents=True, exist_ok=True)
+                logger.debug("Directory %s created", releasedir)
+            except OSError as e:
+                logger.warning("Creating directory %s failed: %s", releasedir, e)
+                raise
+
+            # Wait for the current translations tarballs from launchpad
+            for (download_url, _, _), future in zip(builds, download_futures):
+                try:
+                    if future.result():
+                        logger.debug("Translations tarball downloaded.")
+                    else:
+                        logger.debug("Translations tarball unchanged, skipped download.")
+                except Exception as e:
+                    logger.debug("Downloading %s failed: %s", download_url, e)
+                    raise
+
+        # Don't run the import scripts while the checkout is being updated
+        if checkout is not None:
+            checkout.result()
+
+        # The imports share the release build directory, the update has to be
+        # applied on top of the base packages so run them in order
+        for _, tarball, import_options in builds:
+            self._import_tarball(release, tarball, import_options)
+
+    def build_langpacks_many(self, base: bool, releases: list, both: bool = False):
+        """Build the langpacks of several releases in parallel.
+
+        Each release has its own tarballs and build directory, the first
+        failure is raised once all the builds are done.
+        """
+        releases = [r.lower() for r in releases]
+        if not releases:
+            return
+
+        # cached_property isn't locked, create the Launchpad client and the
+        # HTTP session before fanning out or the threads could each build
+        # their own and not share the connection pool
+        client = self.launchpad_client
+        _ = self._http
+
+        # Resolve devel before deduplicating, "devel,questing" would otherwise
+        # run two concurrent builds in the same directory
+        if "devel" in releases:
+            devel = client.devel_series()
+            releases = [devel if r == "devel" else r for r in releases]
+        releases = list(dict.fromkeys(releases))
+
+        active_series = client.active_series()
+        for release in releases:
+            if release not in active_series:
+                logger.debug("Release %s isn't an active Ubuntu series", release)
+        releases = [r for r in releases if r in active_series]
+        if not releases:
+            return
+
+        # The builds run the scripts from the same checkout, update it once
+        # while the tarballs download, the imports wait for it to be done
+        workers = min(len(releases), os.cpu_count() or 1) + 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            checkout = executor.submit(self.update_checkout)
+            futures = [
+                executor.submit(self.build_langpacks, base, r, both, checkout) for r in releases
+            ]
+
+        for future in futures:
+            future.result()
+
     def upload_langpacks(self):
         """Upload the packages."""
         try:
             logpath = LOGDIR / "upload.log"
-            with open(logpath, "a") as logfile:
+            with open(logpath, "ab") as logfile:
                 run(
                     [
-                        REPO_LOCATION / "packages",
+                        PACKAGES_SCRIPT,
                         "upload",
                     ],
                     cwd=BUILDDIR,
                     check=True,
                     stdout=logfile,
                     stderr=STDOUT,
-                    text=True,
                 )
             logger.debug("Language packs uploaded.")
-        except CalledProcessError as e:
-            logger.debug("Uploading the langpacks failed: %s", e.stdout)
+        except CalledProcessError:
+            logger.debug("Uploading the langpacks failed: %s", _log_tail(logpath))
             raise
 
     def disable_crontab(self):
         """Disable the crontab."""
         try:
-            run(
+            _run_logged(
                 [
                     "crontab",
                     "-r",
                 ],
-                check=True,
-                stdout=PIPE,
-                stderr=STDOUT,
-                text=True,
             )
         except CalledProcessError as e:
-            logger.debug("Disabling of crontab failed: %s", e.stdout)
+            logger.debug("Disabling of crontab failed: %s", e.stderr.decode(errors="replace"))
             raise
 
     def import_gpg_key(self, key: str):
         """Import the private gpg key."""
+        if not key:
+            logger.warning("The signing key secret has no 'key' content")
+            raise ValueError("empty signing key")
+
+        # config-changed fires often, don't re-import a key we already have
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        stamp = _gpg_key_stamp()
+        try:
+            if stamp.read_text() == digest:
+                logger.debug("GPG key unchanged, skipping import.")
+                return
+        except OSError:
+            pass
+
         try:
             response = run(
                 [
@@ -294,25 +586,27 @@ class Langpacks:
             logger.debug("Importing key failed: %s", e.stdout)
             raise
 
+        try:
+            stamp.write_text(digest)
+        except OSError as e:
+            logger.warning("Recording the imported key hash failed: %s", e)
+
     def check_gpg_key(self):
         """Check if a private gpg key is configured."""
         try:
-            response = run(
+            with Popen(
                 [
                     "gpg",
                     "--list-secret-keys",
                     "--with-colons",
                 ],
-                check=True,
                 stdout=PIPE,
-                stderr=STDOUT,
+                stderr=DEVNULL,
                 text=True,
-            )
-            for line in response.stdout.splitlines():
-                # if the output includes 'sec' then there is a secret key
-                if line.startswith("sec:"):
-                    return True
-            return False
+            ) as process:
+                # if the output includes 'sec' then there is a secret key, stop
+                # reading at the first one
+                return any(line.startswith("sec:") for line in process.stdout)
         except Exception as e:
             logger.debug("Listing available gpg keys failed: %s", e)
             return False
@@ -5,11 +5,16 @@
 """A simple Launchpad client implementation."""
 
 import os
+import threading
+import time
 from abc import ABC
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import httplib2
-from launchpadlib.launchpad import Launchpad
+if TYPE_CHECKING:
+    import httplib2
+
+# How long the list of active series is cached, in seconds.
+SERIES_CACHE_TTL = 300
 
 
 class LaunchpadClientBase(ABC):
@@ -19,25 +24,68 @@ class LaunchpadClientBase(ABC):
         """Return a list of the active ubuntu series."""
         return []
 
+    def devel_series(self):
+        """Return the name of the ubuntu development series."""
+        return None
+
+    def invalidate(self):
+        """Drop any cached Launchpad data."""
+
 
 class LaunchpadClient(LaunchpadClientBase):
     """Launchpad client implementation."""
 
+    def __init__(self):
+        self._lp = None
+        self._ubuntu = None
+        self._series_cache = (0.0, None)
+        # The builds of several releases can query the client concurrently
+        self._lock = threading.Lock()
+
+    def _login(self):
+        """Return an anonymous Launchpad session, logging in on first use."""
+        if self._lp is None:
+            # launchpadlib pulls in lazr.restfulclient and the WADL parsing
+            # machinery, only import it for the hooks that talk to Launchpad
+            from launchpadlib.launchpad import Launchpad
+
+            self._lp = Launchpad.login_anonymously(
+                "langpacks",
+                "production",
+                proxy_info=_proxy_config,
+            )
+        return self._lp
+
+    def _distribution(self):
+        """Return the ubuntu distribution, fetching it on first use."""
+        if self._ubuntu is None:
+            self._ubuntu = self._login().distributions["ubuntu"]
+        return self._ubuntu
+
     def active_series(self):
         """Return a list of the active ubuntu series."""
-        lp = Launchpad.login_anonymously(
-            "langpacks",
-            "production",
-            proxy_info=_proxy_config,
-        )
-        ubuntu = lp.distributions["ubuntu"]
-
-        active_series = []
-        for s in ubuntu.series:
-            if s.active:
-                active_series.append(s.name)
+        with self._lock:
+            timestamp, active_series = self._series_cache
+            if active_series is not None and time.monotonic() - timestamp < SERIES_CACHE_TTL:
+                return active_series
 
-        return active_series
+            ubuntu = self._distribution()
+            active_series = tuple(s.name for s in ubuntu.series if s.active)
+            self._series_cache = (time.monotonic(), active_series)
+
+            return active_series
+
+    def devel_series(self):
+        """Return the name of the ubuntu development series."""
+        with self._lock:
+            return self._distribution().current_series.name
+
+    def invalidate(self):
+        """Drop the Launchpad session and the cached series list."""
+        with self._lock:
+            self._lp = None
+            self._ubuntu = None
+            self._series_cache = (0.0, None)
 
 
 class MockLaunchpadClient(LaunchpadClientBase):
@@ -49,8 +97,12 @@ class MockLaunchpadClient(LaunchpadClientBase):
 
         return active_series
 
+    def devel_series(self):
+        """Return the name of the ubuntu development series."""
+        return "questing"
 
-def _proxy_config(method="https") -> Optional[httplib2.ProxyInfo]:
+
+def _proxy_config(method="https") -> Optional["httplib2.ProxyInfo"]:
     """Get charm proxy information from juju charm environment."""
     if method not in ("http", "https"):
         return
@@ -61,6 +113,8 @@ def _proxy_config(method="https") -> Optional[httplib2.ProxyInfo]:
     if not url:
         return
 
+    import httplib2
+
     noproxy = os.environ.get("JUJU_CHARM_NO_PROXY", None)
 
     return httplib2.proxy_info_from_url(url, method, noproxy)
@@ -0,0 +1,38 @@
+# Copyright 2025 Canonical
+# See LICENSE file for licensing details.
+
+"""Shared fixtures for the charm unit tests."""
+
+import pytest
+from ops.testing import Context, State
+
+from charm import UbuntuLangpacksCharm
+
+
+# Parsing the charm metadata is the costly part, share one context across tests
+@pytest.fixture(scope="session")
+def ctx():
+    return Context(UbuntuLangpacksCharm)
+
+
+@pytest.fixture
+def _reset_ctx(ctx):
+    """Drop what the shared context recorded during the previous test.
+
+    Used by the charm test modules, the other tests don't need a context.
+    """
+    for history in (
+        ctx.action_logs,
+        ctx.juju_log,
+        ctx.app_status_history,
+        ctx.unit_status_history,
+        ctx.workload_version_history,
+        ctx.removed_secret_revisions,
+        ctx.emitted_events,
+    ):
+        history.clear()
+
+
+@pytest.fixture(scope="session")
+def base_state():
+    return State(leader=True)
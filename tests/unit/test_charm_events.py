@@ -0,0 +1,196 @@
+# Copyright 2025 Canonical
+# See LICENSE file for licensing details.
+
+"""Unit tests for the charm lifecycle events and actions.
+
+These tests only cover those methods that do not require internet access,
+and do not attempt to manipulate the underlying machine.
+"""
+
+from subprocess import CalledProcessError
+from unittest.mock import Mock
+
+import pytest
+from charms.operator_libs_linux.v0.apt import PackageError, PackageNotFoundError
+from git import GitCommandError
+from ops.testing import ActiveStatus, BlockedStatus
+from requests.exceptions import RequestException
+
+pytestmark = pytest.mark.usefixtures("_reset_ctx")
+
+_GIT_CLONE_ERR = GitCommandError(command="git clone", status=128)
+_GIT_PULL_ERR = GitCommandError(command="git pull", status=128)
+_GIT_FETCH_ERR = GitCommandError(command="git fetch", status=128)
+_CPE_FOO = CalledProcessError(1, "foo")
+_CPE_GIT = CalledProcessError(1, "git")
+_CPE_BUILD = CalledProcessError(1, "build")
+_CPE_UPLOAD = CalledProcessError(1, "upload")
+
+# Only the CalledProcessError rows run by default, the other exceptions are
+# taken by the same except clauses and only run with the slow marker
+_SLOW = pytest.mark.slow
+
+INSTALL_EXCEPTIONS = (
+    pytest.param(PackageError, id="PackageError", marks=_SLOW),
+    pytest.param(PackageNotFoundError, id="PackageNotFoundError", marks=_SLOW),
+    pytest.param(_GIT_CLONE_ERR, id="GitCommandError", marks=_SLOW),
+    pytest.param(_CPE_FOO, id="CalledProcessError"),
+)
+
+_BLOCKED_SETUP = BlockedStatus(
+    "Failed to set up the environment. Check `juju debug-log` for details."
+)
+_BLOCKED_START = BlockedStatus("Failed to start services. Check `juju debug-log` for details.")
+_ACTIVE_BUILD_FAIL = ActiveStatus("Failed to build langpacks. Check `juju debug-log` for details.")
+_ACTIVE_UPLOAD_DISABLED = ActiveStatus("Upload disabled. Set and grant 'gpg-secret-id' to enable.")
+_ACTIVE_UPLOAD_FAIL = ActiveStatus(
+    "Failed to upload langpacks. Check `juju debug-log` for details."
+)
+_LOG_BUILDING = "Building langpacks, it may take a while"
+_LOG_BUILD_FAILED = "Langpacks build failed"
+_LOG_UPLOADING = "Uploading langpacks, it may take a while"
+_LOG_NO_KEY = "Can't upload langpacks without a signing key"
+
+
+class TestInstall:
+    @pytest.fixture(autouse=True)
+    def install_mock(self, monkeypatch):
+        mock = Mock()
+        monkeypatch.setattr("charm.Langpacks.install", mock)
+        return mock
+
+    @pytest.fixture(autouse=True)
+    def setup_crontab_mock(self, monkeypatch):
+        mock = Mock()
+        monkeypatch.setattr("charm.Langpacks.setup_crontab", mock)
+        return mock
+
+    def test_install_success(self, install_mock, ctx, base_state):
+        install_mock.return_value = True
+        out = ctx.run(ctx.on.install(), base_state)
+        assert out.unit_status == ActiveStatus("")
+
+    def test_upgrade_success(self, install_mock, ctx, base_state):
+        install_mock.return_value = True
+        out = ctx.run(ctx.on.upgrade_charm(), base_state)
+        assert out.unit_status == ActiveStatus("")
+
+    @pytest.mark.parametrize("event", ["install", "upgrade_charm"])
+    @pytest.mark.parametrize("exception", INSTALL_EXCEPTIONS)
+    def test_install_failure(self, install_mock, exception, event, ctx, base_state):
+        install_mock.side_effect = exception
+        out = ctx.run(getattr(ctx.on, event)(), base_state)
+        assert out.unit_status == _BLOCKED_SETUP
+
+
+class TestStart:
+    @pytest.fixture(autouse=True)
+    def update_checkout_mock(self, monkeypatch):
+        mock = Mock()
+        monkeypatch.setattr("charm.Langpacks.update_checkout", mock)
+        return mock
+
+    def test_start_success(self, ctx, base_state):
+        out = ctx.run(ctx.on.start(), base_state)
+        assert out.unit_status == ActiveStatus()
+
+    @pytest.mark.parametrize(
+        "exception",
+        [
+            pytest.param(_CPE_GIT, id="CalledProcessError"),
+            pytest.param(_GIT_PULL_ERR, id="GitCommandError", marks=_SLOW),
+        ],
+    )
+    def test_start_failure(self, update_checkout_mock, exception, ctx, base_state):
+        update_checkout_mock.side_effect = exception
+        out = ctx.run(ctx.on.start(), base_state)
+        assert out.unit_status == _BLOCKED_START
+
+
+class TestBuildLangpacks:
+    @pytest.fixture(autouse=True)
+    def build_langpacks_mock(self, monkeypatch):
+        mock = Mock()
+        monkeypatch.setattr("charm.Langpacks.build_langpacks_many", mock)
+        return mock
+
+    def test_build_langpacks_success(self, ctx, base_state):
+        out = ctx.run(
+            ctx.on.action(
+                "build-langpacks", params={"release": "questing", "base": True, "both": False}
+            ),
+            base_state,
+        )
+        assert ctx.action_logs == [_LOG_BUILDING]
+        assert out.unit_status == ActiveStatus()
+
+    def test_build_langpacks_both(self, build_langpacks_mock, ctx, base_state):
+        out = ctx.run(
+            ctx.on.action(
+                "build-langpacks", params={"release": "questing", "base": False, "both": True}
+            ),
+            base_state,
+        )
+        assert out.unit_status == ActiveStatus()
+        build_langpacks_mock.assert_called_once_with(False, ["questing"], True)
+
+    def test_build_langpacks_many(self, build_langpacks_mock, ctx, base_state):
+        out = ctx.run(
+            ctx.on.action(
+                "build-langpacks",
+                params={"release": "noble, questing", "base": True, "both": False},
+            ),
+            base_state,
+        )
+        assert out.unit_status == ActiveStatus()
+        build_langpacks_mock.assert_called_once_with(True, ["noble", "questing"], False)
+
+    @pytest.mark.parametrize(
+        "exception",
+        [
+            pytest.param(IOError, id="IOError", marks=_SLOW),
+            pytest.param(RequestException, id="RequestException", marks=_SLOW),
+            pytest.param(_CPE_BUILD, id="CalledProcessError"),
+            pytest.param(_GIT_FETCH_ERR, id="GitCommandError", marks=_SLOW),
+        ],
+    )
+    def test_build_langpacks_failure(self, build_langpacks_mock, exception, ctx, base_state):
+        build_langpacks_mock.side_effect = exception
+        out = ctx.run(
+            ctx.on.action(
+                "build-langpacks", params={"release": "questing", "base": True, "both": False}
+            ),
+            base_state,
+        )
+        assert ctx.action_logs == [_LOG_BUILDING, _LOG_BUILD_FAILED]
+        assert out.unit_status == _ACTIVE_BUILD_FAIL
+
+
+class TestUploadLangpacks:
+    @pytest.fixture(autouse=True)
+    def mocks(self, monkeypatch):
+        check_gpg_key_mock = Mock()
+        upload_langpacks_mock = Mock()
+        monkeypatch.setattr("charm.Langpacks.check_gpg_key", check_gpg_key_mock)
+        monkeypatch.setattr("charm.Langpacks.upload_langpacks", upload_langpacks_mock)
+        return check_gpg_key_mock, upload_langpacks_mock
+
+    @pytest.mark.parametrize(
+        "has_key,upload_side_effect,expected_status,expected_logs",
+        [
+            pytest.param(True, None, ActiveStatus(), [_LOG_UPLOADING], id="success"),
+            pytest.param(False, None, _ACTIVE_UPLOAD_DISABLED, [_LOG_NO_KEY], id="no_key"),
+            pytest.param(True, _CPE_UPLOAD, _ACTIVE_UPLOAD_FAIL, [_LOG_UPLOADING], id="failure"),
+        ],
+    )
+    def test_upload_langpacks(
+        self, mocks, has_key, upload_side_effect, expected_status, expected_logs, ctx, base_state
+    ):
+        check_gpg_key_mock, upload_langpacks_mock = mocks
+        check_gpg_key_mock.return_value = has_key
+        if upload_side_effect:
+            upload_langpacks_mock.side_effect = upload_side_effect
+        out = ctx.run(ctx.on.action("upload-langpacks"), base_state)
+        assert ctx.action_logs == expected_logs
+        assert out.unit_status == expected_status
+        assert upload_langpacks_mock.called == has_key
@@ -0,0 +1,91 @@
+# Copyright 2025 Canonical
+# See LICENSE file for licensing details.
+
+"""Unit tests for the charm handlers that only set a status.
+
+These cover the config-changed and stop events, which mock a single call
+and return quickly.
+"""
+
+from subprocess import CalledProcessError
+from unittest.mock import Mock
+
+import pytest
+from ops.testing import ActiveStatus, MaintenanceStatus, Secret, State
+
+pytestmark = pytest.mark.usefixtures("_reset_ctx")
+
+_CPE_GPG = CalledProcessError(1, "gpg")
+_CPE_CRONTAB = CalledProcessError(1, "crontab")
+
+_ACTIVE_SIGNING_DISABLED = ActiveStatus("Signing disabled. Set the 'gpg-secret-id' to enable.")
+_ACTIVE_SECRET_UNAVAILABLE = ActiveStatus("Secret not available. Check that access was granted.")
+_ACTIVE_KEY_IMPORT_FAIL = ActiveStatus(
+    "Failed to import the signing key. Check `juju debug-log` for details."
+)
+_MAINTENANCE_STOP = MaintenanceStatus("Removing crontab")
+
+
+# Secret is a frozen dataclass, the same instance can be shared by every test
+@pytest.fixture(scope="session")
+def gpg_secret():
+    return Secret(tracked_content={"key": "GPG_PRIVATE_KEY"})
+
+
+class TestConfigChanged:
+    @pytest.fixture(autouse=True)
+    def import_gpg_key_mock(self, monkeypatch):
+        mock = Mock()
+        monkeypatch.setattr("charm.Langpacks.import_gpg_key", mock)
+        return mock
+
+    def test_config_changed_no_secret(self, ctx, base_state):
+        out = ctx.run(ctx.on.config_changed(), base_state)
+        assert out.unit_status == _ACTIVE_SIGNING_DISABLED
+
+    # needs to mock ops.SecretNotFoundError, ops.model.ModelError
+    def test_config_changed_secret_not_granted(self, ctx, gpg_secret):
+        state = State(leader=True, config={"gpg-secret-id": gpg_secret.id})
+        out = ctx.run(ctx.on.config_changed(), state)
+        assert out.unit_status == _ACTIVE_SECRET_UNAVAILABLE
+
+    @pytest.fixture
+    def secret_state(self, gpg_secret):
+        state = State(leader=True, secrets=[gpg_secret], config={"gpg-secret-id": gpg_secret.id})
+        return gpg_secret, state
+
+    @pytest.mark.parametrize(
+        "side_effect,expected",
+        [
+            pytest.param(None, ActiveStatus(), id="success"),
+            pytest.param(_CPE_GPG, _ACTIVE_KEY_IMPORT_FAIL, id="import_failure"),
+            pytest.param(ValueError(), _ACTIVE_KEY_IMPORT_FAIL, id="missing_key"),
+        ],
+    )
+    def test_config_changed_with_secret(
+        self, side_effect, expected, import_gpg_key_mock, ctx, secret_state
+    ):
+        if side_effect:
+            import_gpg_key_mock.side_effect = side_effect
+        _, state = secret_state
+        out = ctx.run(ctx.on.config_changed(), state)
+        assert out.unit_status == expected
+
+
+class TestStop:
+    @pytest.fixture(autouse=True)
+    def disable_crontab_mock(self, monkeypatch):
+        mock = Mock()
+        monkeypatch.setattr("charm.Langpacks.disable_crontab", mock)
+        return mock
+
+    @pytest.mark.parametrize(
+        "side_effect",
+        [pytest.param(None, id="success"), pytest.param(_CPE_CRONTAB, id="failure")],
+    )
+    def test_stop(self, side_effect, disable_crontab_mock, ctx, base_state):
+        if side_effect:
+            disable_crontab_mock.side_effect = side_effect
+        out = ctx.run(ctx.on.stop(), base_state)
+        assert out.unit_status == _MAINTENANCE_STOP
+        assert disable_crontab_mock.called
@@ -0,0 +1,274 @@
+# Copyright 2025 Canonical
+# See LICENSE file for licensing details.
+
+"""Unit tests for the langpacks service.
+
+The network, git and the external commands are mocked, the filesystem
+accesses use temporary directories.
+"""
+
+import hashlib
+import io
+from subprocess import CalledProcessError
+from unittest.mock import MagicMock, Mock
+
+import pytest
+from charms.operator_libs_linux.v0.apt import PackageError, PackageNotFoundError
+
+from langpacks import TRANSLATIONS_URL, Langpacks
+from launchpad import MockLaunchpadClient
+
+
+@pytest.fixture
+def langpacks(monkeypatch):
+    langpacks = Langpacks(MockLaunchpadClient)
+    for method in (
+        "update_checkout",
+        "_clean_builddir",
+        "_download_tarball",
+        "_import_tarball",
+    ):
+        monkeypatch.setattr(langpacks, method, Mock())
+    return langpacks
+
+
+def test_build_langpacks_inactive_release(langpacks):
+    langpacks.build_langpacks(True, "bionic")
+    assert not langpacks._download_tarball.called
+    assert not langpacks._clean_builddir.called
+    assert not langpacks._import_tarball.called
+
+
+@pytest.mark.parametrize("has_stamp", [True, False])
+def test_import_gpg_key_unchanged(monkeypatch, tmp_path, has_stamp):
+    if has_stamp:
+        (tmp_path / "langpacks-key.sha256").write_text(hashlib.sha256(b"KEY").hexdigest())
+    run_mock = Mock()
+    monkeypatch.setenv("GNUPGHOME", str(tmp_path))
+    monkeypatch.setattr("langpacks.run", run_mock)
+    Langpacks(MockLaunchpadClient).import_gpg_key("KEY")
+    # The stamp is removed together with the keyring, the key is imported again then
+    assert run_mock.called != has_stamp
+
+
+def test_import_gpg_key_missing(monkeypatch):
+    run_mock = Mock()
+    monkeypatch.setattr("langpacks.run", run_mock)
+    with pytest.raises(ValueError):
+        Langpacks(MockLaunchpadClient).import_gpg_key(None)
+    run_mock.assert_not_called()
+
+
+def test_import_tarball_update_stamp(monkeypatch, tmp_path):
+    langpacks = Langpacks(MockLaunchpadClient)
+    (tmp_path / "build" / "questing").mkdir(parents=True)
+    tarball = tmp_path / "ubuntu-questing-translations-update.tar.gz"
+    tarball.write_bytes(b"translations")
+    run_mock = Mock()
+    monkeypatch.setattr("langpacks.BUILDDIR", tmp_path / "build")
+    monkeypatch.setattr("langpacks.LOGDIR", tmp_path)
+    monkeypatch.setattr("langpacks.run", run_mock)
+    monkeypatch.setattr(langpacks, "_checkout_head", Mock(return_value="abc"))
+
+    langpacks._import_tarball("questing", tarball, ["--update"])
+    langpacks._import_tarball("questing", tarball, ["--update"])
+    assert run_mock.call_count == 1
+
+    # A new revision of the import script imports the same tarball again
+    langpacks._checkout_head.return_value = "def"
+    langpacks._import_tarball("questing", tarball, ["--update"])
+    assert run_mock.call_count == 2
+
+
+def test_import_tarball_base_not_hashed(monkeypatch, tmp_path):
+    langpacks = Langpacks(MockLaunchpadClient)
+    sha256sum_mock = Mock()
+    monkeypatch.setattr("langpacks.LOGDIR", tmp_path)
+    monkeypatch.setattr("langpacks.run", Mock())
+    monkeypatch.setattr("langpacks._sha256sum", sha256sum_mock)
+    langpacks._import_tarball("questing", tmp_path / "ubuntu-questing-translations.tar.gz", [])
+    assert not sha256sum_mock.called
+
+
+def test_build_langpacks_many_updates_checkout_once(langpacks, monkeypatch):
+    monkeypatch.setattr(langpacks, "build_langpacks", Mock())
+    langpacks.build_langpacks_many(True, ["noble", "questing"])
+    assert langpacks.update_checkout.call_count == 1
+    assert langpacks.build_langpacks.call_count == 2
+
+
+def test_build_langpacks_many_devel_dedup(langpacks, monkeypatch):
+    monkeypatch.setattr(langpacks, "build_langpacks", Mock())
+    langpacks.build_langpacks_many(False, ["devel", "Questing"])
+    assert langpacks.build_langpacks.call_count == 1
+    assert langpacks.build_langpacks.call_args.args[:3] == (False, "questing", False)
+
+
+def test_build_langpacks_many_inactive_releases(langpacks, monkeypatch):
+    monkeypatch.setattr(langpacks, "build_langpacks", Mock())
+    langpacks.build_langpacks_many(True, ["bionic", "focal"])
+    assert not langpacks.update_checkout.called
+    assert not langpacks.build_langpacks.called
+
+
+@pytest.mark.parametrize(
+    "base,both,tarballs,clean",
+    [
+        pytest.param(True, False, ["translations"], True, id="base"),
+        pytest.param(False, False, ["translations-update"], False, id="update"),
+        pytest.param(False, True, ["translations", "translations-update"], True, id="both"),
+    ],
+)
+def test_build_langpacks_scheduling(langpacks, monkeypatch, tmp_path, base, both, tarballs, clean):
+    monkeypatch.setattr("langpacks.BUILDDIR", tmp_path)
+    langpacks.build_langpacks(base, "questing", both)
+    expected = [f"ubuntu-questing-{tarball}.tar.gz" for tarball in tarballs]
+    downloaded = [c.args[1].name for c in langpacks._download_tarball.call_args_list]
+    assert sorted(downloaded) == sorted(expected)
+    # The base import has to run before the update is applied on top of it
+    assert [c.args[1].name for c in langpacks._import_tarball.call_args_list] == expected
+    assert langpacks._clean_builddir.called == clean
+
+
+def test_build_langpacks_waits_for_checkout(langpacks, monkeypatch, tmp_path):
+    monkeypatch.setattr("langpacks.BUILDDIR", tmp_path)
+    calls = []
+    checkout = Mock()
+    checkout.result.side_effect = lambda: calls.append("checkout")
+    langpacks._download_tarball.side_effect = lambda *args: calls.append("download")
+    langpacks._import_tarball.side_effect = lambda *args: calls.append("import")
+    langpacks.build_langpacks(False, "questing", checkout=checkout)
+    assert calls == ["download", "checkout", "import"]
+
+
+def _response(status_code=200, body=b"", headers=None):
+    response = MagicMock(status_code=status_code, headers=headers or {}, raw=io.BytesIO(body))
+    response.__enter__.return_value = response
+    return response
+
+
+@pytest.fixture
+def tarball(tmp_path):
+    return tmp_path / "ubuntu-questing-translations.tar.gz"
+
+
+def test_download_tarball_no_validators_without_tarball(monkeypatch, tarball):
+    langpacks = Langpacks(MockLaunchpadClient)
+    (tarball.parent / f"{tarball.name}.etag").write_text('"abc"')
+    monkeypatch.setattr(langpacks, "_http", Mock())
+    langpacks._http.get.return_value = _response(body=b"translations")
+    assert langpacks._download_tarball(TRANSLATIONS_URL, tarball)
+    assert "If-None-Match" not in langpacks._http.get.call_args.kwargs["headers"]
+    assert tarball.read_bytes() == b"translations"
+
+
+def test_download_tarball_not_modified(monkeypatch, tarball):
+    langpacks = Langpacks(MockLaunchpadClient)
+    tarball.write_bytes(b"translations")
+    (tarball.parent / f"{tarball.name}.etag").write_text('"abc"')
+    monkeypatch.setattr(langpacks, "_http", Mock())
+    langpacks._http.get.return_value = _response(status_code=304)
+    assert not langpacks._download_tarball(TRANSLATIONS_URL, tarball)
+    assert langpacks._http.get.call_args.kwargs["headers"]["If-None-Match"] == '"abc"'
+    assert tarball.read_bytes() == b"translations"
+
+
+@pytest.mark.parametrize(
+    "header,value,request_header",
+    [
+        pytest.param("ETag", '"abc"', "If-None-Match", id="etag"),
+        pytest.param(
+            "Last-Modified",
+            "Wed, 15 Oct 2025 10:00:00 GMT",
+            "If-Modified-Since",
+            id="last_modified",
+        ),
+    ],
+)
+def test_download_tarball_validators_roundtrip(
+    monkeypatch, tarball, header, value, request_header
+):
+    langpacks = Langpacks(MockLaunchpadClient)
+    monkeypatch.setattr(langpacks, "_http", Mock())
+    langpacks._http.get.return_value = _response(body=b"translations", headers={header: value})
+    assert langpacks._download_tarball(TRANSLATIONS_URL, tarball)
+    assert (tarball.parent / f"{tarball.name}.{header.lower()}").read_text() == value
+
+    langpacks._http.get.return_value = _response(status_code=304)
+    assert not langpacks._download_tarball(TRANSLATIONS_URL, tarball)
+    assert langpacks._http.get.call_args.kwargs["headers"][request_header] == value
+
+
+def test_download_tarball_drops_stale_validators(monkeypatch, tarball):
+    langpacks = Langpacks(MockLaunchpadClient)
+    tarball.write_bytes(b"old translations")
+    etag = tarball.parent / f"{tarball.name}.etag"
+    etag.write_text('"abc"')
+    body = io.BytesIO(b"translations")
+    stale_while_writing = []
+
+    def read(*args):
+        stale_while_writing.append(etag.exists())
+        return body.read(*args)
+
+    response = _response()
+    response.raw.read = read
+    monkeypatch.setattr(langpacks, "_http", Mock())
+    langpacks._http.get.return_value = response
+    assert langpacks._download_tarball(TRANSLATIONS_URL, tarball)
+    assert tarball.read_bytes() == b"translations"
+    assert not any(stale_while_writing)
+    assert not etag.exists()
+
+
+@pytest.mark.parametrize(
+    "ls_remote,fetched",
+    [
+        pytest.param("abc\tHEAD\n", False, id="up_to_date"),
+        pytest.param("def\tHEAD\n", True, id="outdated"),
+        pytest.param("", True, id="no_remote_head"),
+    ],
+)
+def test_update_git(monkeypatch, ls_remote, fetched):
+    repo = Mock()
+    repo.git.ls_remote.return_value = ls_remote
+    repo.head.dereference_recursive.return_value = "abc"
+    monkeypatch.setattr("git.Repo", Mock(return_value=repo))
+    Langpacks(MockLaunchpadClient)._update_git("https://example.com/repo", "/tmp/repo")
+    assert repo.git.fetch.called == fetched
+    assert repo.git.reset.called == fetched
+
+
+def test_http_adapter_covers_redirects():
+    session = Langpacks(MockLaunchpadClient)._http
+    adapter = session.get_adapter("https://launchpadlibrarian.net/123/tarball.tar.gz")
+    assert adapter is session.get_adapter(TRANSLATIONS_URL)
+    assert adapter.max_retries.total == 3
+
+
+@pytest.mark.parametrize(
+    "stderr,exception",
+    [
+        pytest.param(b"E: Unable to locate package gnupg", PackageNotFoundError, id="not_found"),
+        pytest.param(b"E: Sub-process /usr/bin/dpkg returned an error", PackageError, id="error"),
+    ],
+)
+def test_add_packages_failure(monkeypatch, stderr, exception):
+    run_mock = Mock(side_effect=CalledProcessError(100, "apt-get", stderr=stderr))
+    monkeypatch.setattr("langpacks.run", run_mock)
+    with pytest.raises(exception):
+        Langpacks(MockLaunchpadClient)._add_packages()
+    assert "--no-install-recommends" in run_mock.call_args.args[0]
+    assert "--option=Dpkg::Options::=--force-confold" in run_mock.call_args.args[0]
+
+
+def test_build_langpacks_many_shares_session(langpacks, monkeypatch):
+    sessions = []
+
+    def build(*args):
+        sessions.append(langpacks._http)
+
+    monkeypatch.setattr(langpacks, "build_langpacks", Mock(side_effect=build))
+    langpacks.build_langpacks_many(True, ["noble", "plucky", "questing"])
+    assert len(sessions) == 3
+    assert all(session is sessions[0] for session in sessions)
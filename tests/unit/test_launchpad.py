@@ -0,0 +1,49 @@
+# Copyright 2025 Canonical
+# See LICENSE file for licensing details.
+
+"""Unit tests for the Launchpad client caching."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from launchpad import SERIES_CACHE_TTL, LaunchpadClient
+
+
+def _series(name, active):
+    series = Mock(active=active)
+    series.name = name
+    return series
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = LaunchpadClient()
+    ubuntu = Mock(series=[_series("noble", True), _series("bionic", False)])
+    monkeypatch.setattr(client, "_distribution", Mock(return_value=ubuntu))
+    return client
+
+
+def test_active_series_cached(client):
+    assert client.active_series() == ("noble",)
+    assert client.active_series() == ("noble",)
+    assert client._distribution.call_count == 1
+
+
+def test_active_series_expired(client):
+    client.active_series()
+    timestamp, active_series = client._series_cache
+    client._series_cache = (timestamp - SERIES_CACHE_TTL, active_series)
+    client.active_series()
+    assert client._distribution.call_count == 2
+
+
+def test_invalidate(client):
+    client.active_series()
+    client._lp = Mock()
+    client._ubuntu = Mock()
+    client.invalidate()
+    assert client._lp is None
+    assert client._ubuntu is None
+    client.active_series()
+    assert client._distribution.call_count == 2